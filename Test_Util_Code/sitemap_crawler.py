@@ -1,70 +1,130 @@
+import asyncio
 import os
-from datetime import datetime
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from pydantic import BaseModel
-from langchain_community.document_loaders import WebBaseLoader
+from dataclasses import dataclass
+import aiohttp
+from bs4 import BeautifulSoup
 
 # Load environment variables
 load_dotenv()
 
+# Crawler limits
+MAX_CONCURRENT_REQUESTS = 16
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_DELAY = 60
+sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
 # Data Models
-class FilmDocument(BaseModel):
+@dataclass(slots=True)
+class FilmDocument:
     """Represents a processed film-related document"""
     url: str
     content: str
     metadata: Dict
     timestamp: str
 
-def crawl_website(url: str) -> FilmDocument:
-    """Crawl a single page using WebBaseLoader"""
+def build_metadata(soup: BeautifulSoup, url: str) -> Dict:
+    """Collect source, title, description and language from a parsed page"""
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html := soup.find("html"):
+        metadata["language"] = html.get("lang", "No language found.")
+    return metadata
+
+async def get_with_retry(session: aiohttp.ClientSession, url: str) -> str:
+    """GET a page, backing off exponentially on 429/5xx and honoring Retry-After"""
+    for attempt in range(MAX_RETRIES):
+        # Only hold a crawl slot while the request is in flight, not while backing off
+        async with sem, session.get(url) as response:
+            if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES - 1:
+                response.raise_for_status()
+                return await response.text()
+            retry_after = response.headers.get("Retry-After", "")
+            delay = int(retry_after) if retry_after.isdigit() else 2 ** attempt
+            delay = min(delay, MAX_RETRY_DELAY)
+        print(f"Got {response.status} for {url}, retrying in {delay}s")
+        await asyncio.sleep(delay)
+
+def parse_page(url: str, html: str, timestamp: str) -> FilmDocument:
+    """Parse raw HTML into a FilmDocument (runs in a worker process)"""
+    soup = BeautifulSoup(html, 'lxml')
+    return FilmDocument(
+        url=url,
+        content=soup.get_text(),
+        metadata=build_metadata(soup, url),
+        timestamp=timestamp
+    )
+
+async def crawl_website(session: aiohttp.ClientSession, url: str) -> Optional[str]:
+    """Fetch the raw HTML of a single page using a shared aiohttp session"""
     try:
         print(f"Attempting to crawl {url}")
-        
-        # Initialize WebBaseLoader
-        loader = WebBaseLoader(url)
-        
-        # Load document
-        doc = loader.load()[0]
-        
-        # Convert to FilmDocument
-        film_doc = FilmDocument(
-            url=doc.metadata.get('source', url),
-            content=doc.page_content,
-            metadata=doc.metadata,
-            timestamp=datetime.now().isoformat()
-        )
-        
-        return film_doc
+        return await get_with_retry(session, url)
 
     except Exception as e:
         print(f"Error crawling {url}: {str(e)}")
         return None
 
+async def crawl_websites(urls: List[str]) -> List[FilmDocument]:
+    """Crawl all URLs concurrently and parse them in parallel across cores"""
+    now_iso = datetime.now(timezone.utc).isoformat()
+    connector = aiohttp.TCPConnector(limit=128, limit_per_host=8, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        pages = await asyncio.gather(
+            *[crawl_website(session, url) for url in urls],
+            return_exceptions=True
+        )
+    pages = [(url, html) for url, html in zip(urls, pages) if isinstance(html, str)]
+    if not pages:
+        return []
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=min(len(pages), os.cpu_count() or 1)) as executor:
+        results = await asyncio.gather(
+            *[loop.run_in_executor(executor, parse_page, url, html, now_iso) for url, html in pages],
+            return_exceptions=True
+        )
+
+    documents = []
+    for (url, _), result in zip(pages, results):
+        if isinstance(result, FilmDocument):
+            documents.append(result)
+        else:
+            print(f"Error parsing {url}: {str(result)}")
+    return documents
+
+def format_doc(doc: FilmDocument) -> str:
+    """Format a single document as one output block"""
+    return (
+        f"URL: {doc.url}\n"
+        f"Content length: {len(doc.content)} characters\n"
+        f"Metadata: {doc.metadata}\n"
+        "\nContent:\n"
+        f"{doc.content}"
+        f"\n{'=' * 50}\n"
+    )
+
 def save_to_file(documents: List[FilmDocument], filename: str):
     """Save documents to a text file"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        for doc in documents:
-            f.write(f"URL: {doc.url}\n")
-            f.write(f"Content length: {len(doc.content)} characters\n")
-            f.write(f"Metadata: {doc.metadata}\n")
-            f.write("\nContent:\n")
-            f.write(doc.content)
-            f.write("\n" + "="*50 + "\n")
-
-def main():
+    with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(format_doc(doc) for doc in documents)
+
+async def main():
     # Read URLs from rough_sitemap.txt
     with open("rough_sitemap.txt", "r", encoding="utf-8") as f:
         urls = [line.strip() for line in f.readlines()]
 
-    documents = []
-    for url in urls:
-        doc = crawl_website(url)
-        if doc:
-            documents.append(doc)
+    documents = await crawl_websites(urls)
     
     # Save output to a file
     save_to_file(documents, "sitemap_crawler_output.txt")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,22 +1,23 @@
 import os
-from datetime import datetime
-from typing import Dict, List
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from dataclasses import dataclass
 from langchain_community.document_loaders import WebBaseLoader
 
 # Load environment variables
 load_dotenv()
 
 # Data Models
-class FilmDocument(BaseModel):
+@dataclass(slots=True)
+class FilmDocument:
     """Represents a processed film-related document"""
     url: str
     content: str
     metadata: Dict
     timestamp: str
 
-def crawl_website(url: str) -> FilmDocument:
+def crawl_website(url: str, timestamp: Optional[str] = None) -> FilmDocument:
     """Crawl a single page using WebBaseLoader"""
     try:
         print(f"Attempting to crawl {url}")
@@ -32,7 +33,7 @@ def crawl_website(url: str) -> FilmDocument:
             url=doc.metadata.get('source', url),
             content=doc.page_content,
             metadata=doc.metadata,
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp or datetime.now(timezone.utc).isoformat()
         )
         
         return film_doc
@@ -62,8 +63,9 @@ def main():
         urls = [line.strip() for line in f.readlines()]
 
     documents = []
+    now_iso = datetime.now(timezone.utc).isoformat()
     for url in urls:
-        doc = crawl_website(url)
+        doc = crawl_website(url, now_iso)
         if doc:
             documents.append(doc)
     
@@ -1,10 +1,10 @@
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from dataclasses import dataclass
 from langchain_community.document_loaders import FireCrawlLoader
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 
 # Load environment variables
 load_dotenv()
@@ -17,7 +17,8 @@ if not FIRECRAWL_API_KEY:
 print(FIRECRAWL_API_KEY[:4] + "XXXX")
 
 # Data Models
-class FilmDocument(BaseModel):
+@dataclass(slots=True)
+class FilmDocument:
     """Represents a processed film-related document"""
     url: str
     content: str
@@ -25,12 +26,24 @@ class FilmDocument(BaseModel):
     timestamp: str
 
 def extract_content(html: str) -> str:
-    """Extract specific content from HTML using BeautifulSoup"""
-    soup = BeautifulSoup(html, 'html.parser')
+    """Extract specific content from HTML using lxml"""
+    if not html or not html.strip():
+        return ""
+    try:
+        try:
+            tree = lxml_html.fromstring(html)
+        except ValueError:
+            # lxml refuses str input with an XML encoding declaration; parse the bytes instead
+            tree = lxml_html.fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        # Comment-only documents
+        return ""
     # Example: Extract main article content
-    article = soup.find('article')
-    if article:
-        return article.get_text(separator='\n').strip()
+    articles = tree.xpath('//article')
+    if articles:
+        article = articles[0]
+        etree.strip_elements(article, 'script', 'style', 'template', with_tail=False)
+        return '\n'.join(article.itertext()).strip()
     return ""
 
 def crawl_website(url: str) -> List[FilmDocument]:
@@ -48,7 +61,8 @@ def crawl_website(url: str) -> List[FilmDocument]:
         # Load documents
         docs = loader.load()
         
-        # Convert to FilmDocuments
+        # Convert to FilmDocuments, stamped with a single crawl time
+        now_iso = datetime.now(timezone.utc).isoformat()
         film_docs = []
         for doc in docs:
             content = extract_content(doc.page_content)
@@ -57,7 +71,7 @@ def crawl_website(url: str) -> List[FilmDocument]:
                     url=doc.metadata.get('sourceURL', url),
                     content=content,
                     metadata=doc.metadata,
-                    timestamp=datetime.now().isoformat()
+                    timestamp=now_iso
                 )
             )
         
@@ -6,7 +6,7 @@ It saves the URLs to a text file in a specified directory.
 
 Features:
     - Crawls kino.de news section
-    - Filters for valid news article URLs
+    - Filters for valid news article URLs with a precompiled pattern
     - Limits the number of articles collected
     - Saves results to a specified directory
     - Handles network errors gracefully
@@ -16,28 +16,85 @@ Usage:
     The sitemap will be saved to: /Users/mg/Desktop/GitHub/ASTRAL/Code/film_monitoring/Data/rough_sitemap.txt
 
 Dependencies:
-    - requests: For making HTTP requests
-    - beautifulsoup4: For parsing HTML content
+    - requests: For making HTTP requests over a shared keep-alive session
+    - lxml: For stream-parsing HTML content and extracting links
     - urllib: For URL parsing and joining
 """
 
+import re
+from email.message import Message
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree
 from urllib.parse import urljoin
 import os
 
-def is_valid_url(url, base_domain):
+# Shared HTTP session so repeated requests re-use pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+SESSION.headers.update({'Accept-Encoding': 'gzip'})
+
+# Compiled predicate matching kino.de news article URLs
+is_news_url = re.compile(r'^https://www\.kino\.de/news/').match
+
+def _drain_hrefs(parser):
+    """Yield hrefs from pending parser events and free the processed elements."""
+    for event, el in parser.read_events():
+        if event == 'start':
+            # Read links as tags open so nested/unclosed anchors keep document order
+            if el.tag == 'a':
+                href = el.get('href')
+                if href:
+                    yield href
+        else:
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+
+def header_charset(headers):
     """
-    Validate if a URL belongs to the specified base domain.
+    Read the charset parameter of a Content-Type header.
     
     Args:
-        url (str): The URL to validate
-        base_domain (str): The base domain to check against
+        headers (Mapping): HTTP response headers
     
     Returns:
-        bool: True if URL is valid and belongs to base_domain, False otherwise
+        str or None: The declared charset, or None if the header has none
     """
-    return url.startswith(base_domain)
+    msg = Message()
+    msg['Content-Type'] = headers.get('Content-Type', '')
+    return msg.get_param('charset')
+
+def iter_hrefs(chunks, encoding=None):
+    """
+    Stream-parse HTML and yield the href of every <a> tag.
+    
+    Elements are discarded as soon as they have been processed, so memory
+    stays bounded regardless of page size.
+    
+    Args:
+        chunks (iterable): Raw HTML byte chunks, e.g. from response.iter_content()
+        encoding (str, optional): Charset of the bytes, e.g. from the Content-Type
+            header. If None, lxml detects it from the document itself
+    
+    Yields:
+        str: The href attribute of each link, in document order
+    """
+    try:
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    except LookupError:
+        # Unknown charset name in the header; let lxml detect it instead
+        parser = etree.HTMLPullParser(events=('start', 'end'))
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _drain_hrefs(parser)
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # Raised for an empty body; keep whatever links were already found
+        pass
+    yield from _drain_hrefs(parser)
 
 def generate_sitemap(start_url, max_articles=10):
     """
@@ -58,21 +115,24 @@ def generate_sitemap(start_url, max_articles=10):
     sitemap = []     # Store valid article URLs
 
     try:
-        # Fetch and parse the webpage
-        response = requests.get(start_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all links and process them
-        for link in soup.find_all('a', href=True):
-            # Convert relative URLs to absolute URLs
-            full_url = urljoin(base_domain, link['href'])
+        # Fetch the webpage as a stream and parse it incrementally
+        with SESSION.get(start_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            
+            # Bind hot-loop methods locally to skip attribute lookups
+            visited_add = visited.add
+            sitemap_append = sitemap.append
             
-            # Check if URL is valid and hasn't been visited
-            if is_valid_url(full_url, base_domain) and full_url not in visited:
-                if '/news/' in full_url:  # Only collect news articles
-                    visited.add(full_url)
-                    sitemap.append(full_url)
+            # Find all links and process them
+            chunks = response.iter_content(chunk_size=1 << 16)
+            for href in iter_hrefs(chunks, header_charset(response.headers)):
+                # Convert relative URLs to absolute URLs, skipping urljoin for absolute ones
+                full_url = href if href.startswith('http') else urljoin(base_domain, href)
+                
+                # Only collect kino.de news articles that haven't been visited
+                if is_news_url(full_url) and full_url not in visited:
+                    visited_add(full_url)
+                    sitemap_append(full_url)
                     
                     # Stop if we've reached the maximum number of articles
                     if len(sitemap) >= max_articles:
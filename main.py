@@ -1,33 +1,103 @@
+import asyncio
+import functools
+import json
+import os
+import re
+from email.message import Message
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from lxml import etree
 from urllib.parse import urljoin
-from datetime import datetime
-from typing import Dict, List, Optional
-from pydantic import BaseModel
-from langchain_community.document_loaders import WebBaseLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+from dataclasses import dataclass, field
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM at the start
-llm = ChatOpenAI(temperature=0)
+# Crawler limits
+MAX_CONCURRENT_REQUESTS = 16
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_DELAY = 60
+sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# LLM limits
+MAX_CONCURRENT_LLM_CALLS = 8
+llm_sem = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+# Shared HTTP session so repeated requests re-use pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+SESSION.headers.update({'Accept-Encoding': 'gzip'})
+
+# Matches the outermost JSON object in an LLM reply that may be wrapped in prose
+JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Compiled predicate matching kino.de news article URLs
+is_news_url = re.compile(r'^https://www\.kino\.de/news/').match
+
+# Number of content characters sent to the LLM for analysis
+PREVIEW_LENGTH = 2000
 
 # Data Models
-class FilmDocument(BaseModel):
+@dataclass(slots=True)
+class FilmDocument:
     """Represents a processed film-related document"""
     url: str
     content: str
     metadata: Dict
     timestamp: str
+    content_preview: str = field(init=False)
     relevance_score: Optional[float] = None
     sentiment: Optional[Dict] = None
     summary: Optional[str] = None
 
+    def __post_init__(self):
+        self.content_preview = self.content[:PREVIEW_LENGTH]
+
+def _drain_hrefs(parser: etree.HTMLPullParser) -> Iterator[str]:
+    """Yield hrefs from pending parser events and free the processed elements"""
+    for event, el in parser.read_events():
+        if event == 'start':
+            # Read links as tags open so nested/unclosed anchors keep document order
+            if el.tag == 'a':
+                href = el.get('href')
+                if href:
+                    yield href
+        else:
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+
+def header_charset(headers: Mapping[str, str]) -> Optional[str]:
+    """Return the charset declared in a Content-Type header, if any"""
+    msg = Message()
+    msg['Content-Type'] = headers.get('Content-Type', '')
+    return msg.get_param('charset')
+
+def iter_hrefs(chunks: Iterable[bytes], encoding: Optional[str] = None) -> Iterator[str]:
+    """Stream-parse HTML chunks and yield every <a> href, discarding elements as we go"""
+    try:
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    except LookupError:
+        # Unknown charset name in the header; let lxml detect it instead
+        parser = etree.HTMLPullParser(events=('start', 'end'))
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _drain_hrefs(parser)
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # Raised for an empty body; keep whatever links were already found
+        pass
+    yield from _drain_hrefs(parser)
+
 def generate_sitemap(start_url: str, max_articles: int = 10) -> List[str]:
     """Generate a sitemap of film articles"""
     base_domain = "https://www.kino.de"
@@ -35,17 +105,20 @@ def generate_sitemap(start_url: str, max_articles: int = 10) -> List[str]:
     sitemap = []
     
     try:
-        response = requests.get(start_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        for link in soup.find_all('a', href=True):
-            full_url = urljoin(base_domain, link['href'])
-            if full_url.startswith(base_domain) and '/news/' in full_url and full_url not in visited:
-                visited.add(full_url)
-                sitemap.append(full_url)
-                if len(sitemap) >= max_articles:
-                    break
+        with SESSION.get(start_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            
+            visited_add = visited.add
+            sitemap_append = sitemap.append
+            
+            chunks = response.iter_content(chunk_size=1 << 16)
+            for href in iter_hrefs(chunks, header_charset(response.headers)):
+                full_url = href if href.startswith('http') else urljoin(base_domain, href)
+                if is_news_url(full_url) and full_url not in visited:
+                    visited_add(full_url)
+                    sitemap_append(full_url)
+                    if len(sitemap) >= max_articles:
+                        break
                     
         print(f"Found {len(sitemap)} URLs")
         return sitemap
@@ -54,80 +127,147 @@ def generate_sitemap(start_url: str, max_articles: int = 10) -> List[str]:
         print(f"Error fetching {start_url}: {str(e)}")
         return []
 
-def crawl_websites(urls: List[str]) -> List[FilmDocument]:
-    """Crawl websites and return list of FilmDocuments"""
+def build_metadata(soup: BeautifulSoup, url: str) -> Dict:
+    """Collect source, title, description and language from a parsed page"""
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html := soup.find("html"):
+        metadata["language"] = html.get("lang", "No language found.")
+    return metadata
+
+async def get_with_retry(session: aiohttp.ClientSession, url: str) -> str:
+    """GET a page, backing off exponentially on 429/5xx and honoring Retry-After"""
+    for attempt in range(MAX_RETRIES):
+        # Only hold a crawl slot while the request is in flight, not while backing off
+        async with sem, session.get(url) as response:
+            if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES - 1:
+                response.raise_for_status()
+                return await response.text()
+            retry_after = response.headers.get("Retry-After", "")
+            delay = int(retry_after) if retry_after.isdigit() else 2 ** attempt
+            delay = min(delay, MAX_RETRY_DELAY)
+        print(f"Got {response.status} for {url}, retrying in {delay}s")
+        await asyncio.sleep(delay)
+
+def parse_page(url: str, html: str, timestamp: str) -> FilmDocument:
+    """Parse raw HTML into a FilmDocument (runs in a worker process)"""
+    soup = BeautifulSoup(html, 'lxml')
+    return FilmDocument(
+        url=url,
+        content=soup.get_text(),
+        metadata=build_metadata(soup, url),
+        timestamp=timestamp
+    )
+
+async def fetch(session: aiohttp.ClientSession, url: str) -> Optional[str]:
+    """Fetch the raw HTML of a single page"""
+    try:
+        print(f"Crawling: {url}")
+        return await get_with_retry(session, url)
+
+    except Exception as e:
+        print(f"Error crawling {url}: {str(e)}")
+        return None
+
+async def crawl_websites(urls: List[str]) -> List[FilmDocument]:
+    """Crawl websites concurrently and parse them in parallel across cores"""
+    now_iso = datetime.now(timezone.utc).isoformat()
+    connector = aiohttp.TCPConnector(limit=128, limit_per_host=8, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        pages = await asyncio.gather(
+            *[fetch(session, url) for url in urls],
+            return_exceptions=True
+        )
+    pages = [(url, html) for url, html in zip(urls, pages) if isinstance(html, str)]
+    if not pages:
+        return []
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=min(len(pages), os.cpu_count() or 1)) as executor:
+        results = await asyncio.gather(
+            *[loop.run_in_executor(executor, parse_page, url, html, now_iso) for url, html in pages],
+            return_exceptions=True
+        )
+
     documents = []
-    for url in urls:
-        try:
-            print(f"Crawling: {url}")
-            loader = WebBaseLoader(url)
-            doc = loader.load()[0]
-            
-            film_doc = FilmDocument(
-                url=doc.metadata.get('source', url),
-                content=doc.page_content,
-                metadata=doc.metadata,
-                timestamp=datetime.now().isoformat()
-            )
-            documents.append(film_doc)
-            
-        except Exception as e:
-            print(f"Error crawling {url}: {str(e)}")
-            continue
-    
+    for (url, _), result in zip(pages, results):
+        if isinstance(result, FilmDocument):
+            documents.append(result)
+        else:
+            print(f"Error parsing {url}: {str(result)}")
     return documents
 
-def analyze_sentiment(text: str) -> Dict:
-    """Analyze sentiment of text using LLM"""
-    response = llm.invoke(
-        f"""Analyze the sentiment of the following text and return only a JSON with scores for positive, negative, and neutral (scores should sum to 1.0):
+@functools.lru_cache(maxsize=None)
+def get_llm():
+    """Create the LLM on first use so non-LLM code paths skip the LangChain import"""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(temperature=0)
 
-        Text: {text[:1000]}
+def build_analysis_prompt(text: str) -> str:
+    """Build a single prompt asking for both sentiment and summary of an already truncated text"""
+    return f"""Analyze the following film-related content and return only a JSON with two keys:
+        - "sentiment": scores for positive, negative, and neutral (scores should sum to 1.0)
+        - "summary": a summary of the content in 2-3 sentences
+
+        Text: {text}
         
-        Return format: {{"positive": float, "negative": float, "neutral": float}}"""
-    )
-    return eval(response.content)  # Convert string to dict
+        Return format: {{"sentiment": {{"positive": float, "negative": float, "neutral": float}}, "summary": str}}"""
+
+def parse_analysis(content: str) -> Dict:
+    """Parse the JSON reply of an analysis prompt"""
+    match = JSON_OBJECT_RE.search(content)
+    return json.loads(match.group(0) if match else content)  # Convert string to dict
+
+async def analyze(doc: FilmDocument) -> FilmDocument:
+    """Analyze a single document with sentiment and summary"""
+    try:
+        async with llm_sem:
+            print(f"Analyzing: {doc.url}")
+            response = await get_llm().ainvoke(build_analysis_prompt(doc.content_preview))
+        analysis = parse_analysis(response.content)
+        doc.sentiment = analysis.get("sentiment")
+        doc.summary = analysis.get("summary")
 
-def generate_summary(text: str) -> str:
-    """Generate a summary of the text using LLM"""
-    response = llm.invoke(
-        f"""Summarize the following film-related content in 2-3 sentences:
+    except Exception as e:
+        print(f"Error analyzing {doc.url}: {str(e)}")
 
-        {text[:2000]}"""
+    return doc
+
+async def analyze_documents(documents: List[FilmDocument]) -> List[FilmDocument]:
+    """Analyze the documents concurrently with sentiment and summary"""
+    return list(await asyncio.gather(*[analyze(doc) for doc in documents]))
+
+def format_doc(doc: FilmDocument) -> str:
+    """Format a single analyzed document as one output block"""
+    return (
+        f"URL: {doc.url}\n"
+        f"Timestamp: {doc.timestamp}\n"
+        f"Summary: {doc.summary}\n"
+        f"Sentiment: {doc.sentiment}\n"
+        "\nContent Preview:\n"
+        f"{doc.content_preview[:500]}...\n"
+        f"{'=' * 50}\n\n"
     )
-    return response.content
-
-def analyze_documents(documents: List[FilmDocument]) -> List[FilmDocument]:
-    """Analyze the documents with sentiment and summary"""
-    for doc in documents:
-        print(f"Analyzing: {doc.url}")
-        doc.sentiment = analyze_sentiment(doc.content)
-        doc.summary = generate_summary(doc.content)
-    return documents
 
 def save_results(documents: List[FilmDocument], filename: str):
     """Save the results to a file"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        for doc in documents:
-            f.write(f"URL: {doc.url}\n")
-            f.write(f"Timestamp: {doc.timestamp}\n")
-            f.write(f"Summary: {doc.summary}\n")
-            f.write(f"Sentiment: {doc.sentiment}\n")
-            f.write("\nContent Preview:\n")
-            f.write(f"{doc.content[:500]}...\n")
-            f.write("="*50 + "\n\n")
-
-def main():
+    with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(format_doc(doc) for doc in documents)
+
+async def main():
     # Step 1: Generate sitemap
     start_url = "https://www.kino.de/news/"
     urls = generate_sitemap(start_url, max_articles=3)  # Limited for testing
     
     # Step 2: Crawl websites
-    documents = crawl_websites(urls)
+    documents = await crawl_websites(urls)
     print(f"Crawled {len(documents)} documents")
     
     # Step 3: Analyze documents
-    analyzed_docs = analyze_documents(documents)
+    analyzed_docs = await analyze_documents(documents)
     
     # Step 4: Save results
     save_results(analyzed_docs, "film_monitoring_results.txt")
@@ -141,4 +281,4 @@ def main():
         print(f"Sentiment: {doc.sentiment}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())